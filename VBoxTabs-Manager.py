@@ -9,8 +9,16 @@ VBoxTabs Manager - Combining VirtualBox windows into a single tabbed window.
 
 import sys
 import os
-import subprocess
 import json
+import time
+import threading
+import importlib
+import importlib.util
+import ctypes
+from collections import namedtuple
+from contextlib import contextmanager
+from ctypes import wintypes
+from concurrent.futures import ThreadPoolExecutor, wait
 import win32gui
 import win32process
 import win32con
@@ -21,8 +29,9 @@ from PySide6.QtWidgets import (QApplication, QMainWindow, QTabWidget, QWidget,
                                QStyleFactory, QComboBox, QToolButton, QMenu,
                                QStyle, QTabBar, QSpinBox, QLineEdit, QGridLayout,
                                QGroupBox, QFileDialog)
-from PySide6.QtCore import Qt, QTimer, Signal, QObject, QSize, QPoint, QSettings
-from PySide6.QtGui import QFont, QAction, QMouseEvent, QIcon
+from PySide6.QtCore import (Qt, QTimer, Signal, QObject, QSize, QPoint, QSettings, QEvent, QThread,
+                            QThreadPool)
+from PySide6.QtGui import QFont, QAction, QMouseEvent, QIcon, QWindow
 
 # Import for Windows registry access (for theme detection)
 try:
@@ -45,119 +54,552 @@ def is_windows_light_theme():
     except (FileNotFoundError, OSError):
         return False
 
-# QDarkStyle
-try:
-    import qdarkstyle
-    QDARKSTYLE_AVAILABLE = True
-except ImportError:
-    QDARKSTYLE_AVAILABLE = False
-
-# qt-themes (optional)
-try:
-    import qt_themes
-    QT_THEMES_AVAILABLE = True
-except ImportError:
-    QT_THEMES_AVAILABLE = False
+# QDarkStyle and qt-themes (optional), only imported when their theme is applied
+QDARKSTYLE_AVAILABLE = importlib.util.find_spec("qdarkstyle") is not None
+QT_THEMES_AVAILABLE = importlib.util.find_spec("qt_themes") is not None
+
+# Theme names mapped to Qt styles or qt-themes themes
+THEME_MAP = {
+    # Standard Qt themes
+    "Dark": "windows11",
+    "Light": "windowsvista",
+    "Classic": "Windows",
+    "Fusion": "Fusion",
+    "QDark": "qdarkstyle",
+
+    # qt-themes themes
+    "Atom One": "atom_one",
+    "Blender": "blender",
+    "Catppuccin Frappe": "catppuccin_frappe",
+    "Catppuccin Latte": "catppuccin_latte",
+    "Catppuccin Macchiato": "catppuccin_macchiato",
+    "Catppuccin Mocha": "catppuccin_mocha",
+    "Dracula": "dracula",
+    "GitHub Dark": "github_dark",
+    "GitHub Light": "github_light",
+    "Modern Dark": "modern_dark",
+    "Modern Light": "modern_light",
+    "Monokai": "monokai",
+    "Nord": "nord",
+    "One Dark Two": "one_dark_two"
+}
+
+# Themes applied with a Qt style and themes applied by qt-themes
+QSTYLE_THEMES = frozenset({"Dark", "Light", "Classic", "Fusion"})
+QT_THEME_NAMES = frozenset(THEME_MAP) - QSTYLE_THEMES - {"QDark"}
+
+# Themes offered in the settings dialog, depending on the system and optional packages
+AVAILABLE_THEMES = () if is_windows_light_theme() else ("Dark",)
+AVAILABLE_THEMES += ("Light", "Classic", "Fusion")
+if QDARKSTYLE_AVAILABLE:
+    AVAILABLE_THEMES += ("QDark",)
+if QT_THEMES_AVAILABLE:
+    AVAILABLE_THEMES += tuple(name for name in THEME_MAP if name in QT_THEME_NAMES)
+
+# Default application settings
+DEFAULT_SETTINGS = {
+    "auto_attach": True,
+    "refresh_interval": 5,
+    "vbox_path": r"C:\Program Files\Oracle\VirtualBox\VirtualBox.exe",
+    "theme": "Fusion",
+    "dpi_scaling": "Auto",
+    "qt_window_container": False
+}
 
 # Define Win32 API constants
 WS_CHILD = 0x40000000
+WS_POPUP = 0x80000000
 GWL_STYLE = -16
 SWP_NOSIZE = 0x0001
 SWP_NOMOVE = 0x0002
 SWP_NOZORDER = 0x0004
+SWP_NOACTIVATE = 0x0010
 SWP_FRAMECHANGED = 0x0020
+SWP_NOSENDCHANGING = 0x0400
+SWP_ASYNCWINDOWPOS = 0x4000
 WS_CAPTION = 0x00C00000
 WS_THICKFRAME = 0x00040000
 WS_MINIMIZEBOX = 0x00020000
 WS_MAXIMIZEBOX = 0x00010000
 WS_SYSMENU = 0x00080000
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+# WinEvent hook constants
+EVENT_OBJECT_CREATE = 0x8000
+EVENT_OBJECT_DESTROY = 0x8001
+EVENT_OBJECT_SHOW = 0x8002
+EVENT_OBJECT_NAMECHANGE = 0x800C
+WINEVENT_OUTOFCONTEXT = 0x0000
+WINEVENT_SKIPOWNPROCESS = 0x0002
+OBJID_WINDOW = 0
+CHILDID_SELF = 0
+
+# Fallback polling interval (seconds) while WinEvent hooks are installed
+HOOK_FALLBACK_INTERVAL = 60
+# Quiet period after the last refresh request before the window scan runs (milliseconds)
+REFRESH_DEBOUNCE_INTERVAL = 150
+# Minimum time between two window moves while a tab is resized (milliseconds), ~one frame
+RESIZE_THROTTLE_INTERVAL = 16
+# How long close-all waits for terminated VM processes to exit (milliseconds)
+TERMINATE_WAIT_TIMEOUT = 2000
+# Delay of the refresh after close-all, lets terminated VMs close their windows (milliseconds)
+CLOSE_ALL_REFRESH_DELAY = 500
+# How long status bar notifications stay visible (milliseconds)
+STATUS_MESSAGE_TIMEOUT = 3000
+# Polling slowdown while the main window is inactive or minimized
+INACTIVE_REFRESH_FACTOR = 12
+# Adaptive polling: backoff per unchanged refresh, upper bound of the backoff multiplier,
+# upper bound of the interval (seconds), EWMA weight
+ADAPTIVE_BACKOFF = 1.5
+ADAPTIVE_MAX_BACKOFF = 6
+ADAPTIVE_MAX_INTERVAL = 30
+EWMA_ALPHA = 0.3
+
+# Executables owning VirtualBox windows (main application and VM frontend)
+VBOX_PROCESS_NAMES = frozenset({"virtualbox.exe", "virtualboxvm.exe"})
+# VirtualBox COM service, also terminated by Close All
+VBOX_SVC_PROCESS_NAME = "vboxsvc.exe"
+# Title markers of VirtualBox windows: VM windows are "Name [State] - Oracle VirtualBox"
+# (the state is localized, extra screens append " : 2"), the main application starts with the prefix
+VBOX_VM_TITLE_MARKER = "] - Oracle VirtualBox"
+VBOX_MANAGER_TITLE_PREFIX = "Oracle VirtualBox "
+MIN_VBOX_TITLE_LENGTH = len(VBOX_MANAGER_TITLE_PREFIX)
+
+# Win32 API functions not covered by pywin32
+user32 = ctypes.WinDLL("user32", use_last_error=True)
+
+WINEVENTPROC = ctypes.WINFUNCTYPE(
+    None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+    wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+
+user32.SetWinEventHook.argtypes = [wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE,
+                                   WINEVENTPROC, wintypes.DWORD, wintypes.DWORD,
+                                   wintypes.DWORD]
+user32.SetWinEventHook.restype = wintypes.HANDLE
+user32.UnhookWinEvent.argtypes = [wintypes.HANDLE]
+user32.UnhookWinEvent.restype = wintypes.BOOL
+
+# Window enumeration, bound directly to skip the pywin32 wrappers in the hot loop
+WNDENUMPROC = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+
+user32.EnumWindows.argtypes = [WNDENUMPROC, wintypes.LPARAM]
+user32.EnumWindows.restype = wintypes.BOOL
+user32.EnumThreadWindows.argtypes = [wintypes.DWORD, WNDENUMPROC, wintypes.LPARAM]
+user32.EnumThreadWindows.restype = wintypes.BOOL
+user32.IsWindow.argtypes = [wintypes.HWND]
+user32.IsWindow.restype = wintypes.BOOL
+user32.IsWindowVisible.argtypes = [wintypes.HWND]
+user32.IsWindowVisible.restype = wintypes.BOOL
+user32.GetWindowTextLengthW.argtypes = [wintypes.HWND]
+user32.GetWindowTextLengthW.restype = ctypes.c_int
+user32.GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+user32.GetWindowTextW.restype = ctypes.c_int
+user32.GetClassNameW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+user32.GetClassNameW.restype = ctypes.c_int
+user32.GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+user32.GetWindowThreadProcessId.restype = wintypes.DWORD
+
+shell32 = ctypes.WinDLL("shell32", use_last_error=True)
+# Returns a value greater than 32 on success, an error code otherwise
+shell32.ShellExecuteW.argtypes = [wintypes.HWND, wintypes.LPCWSTR, wintypes.LPCWSTR,
+                                  wintypes.LPCWSTR, wintypes.LPCWSTR, ctypes.c_int]
+shell32.ShellExecuteW.restype = ctypes.c_ssize_t
+# ShellExecuteW error codes that are not Win32 error codes (SE_ERR_*)
+SHELL_EXECUTE_ERRORS = {
+    0: "The system is out of memory or resources.",
+    26: "A sharing violation occurred.",
+    27: "The file name association is incomplete or invalid.",
+    28: "The DDE transaction timed out.",
+    29: "The DDE transaction failed.",
+    30: "The DDE transaction could not be completed because other DDE transactions were being processed.",
+    31: "There is no application associated with the given file name extension.",
+    32: "The specified DLL was not found.",
+}
+
+kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+kernel32.OpenProcess.restype = wintypes.HANDLE
+kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+kernel32.CloseHandle.restype = wintypes.BOOL
+kernel32.QueryFullProcessImageNameW.argtypes = [wintypes.HANDLE, wintypes.DWORD, wintypes.LPWSTR,
+                                                ctypes.POINTER(wintypes.DWORD)]
+kernel32.QueryFullProcessImageNameW.restype = wintypes.BOOL
+kernel32.WaitForMultipleObjects.argtypes = [wintypes.DWORD, ctypes.POINTER(wintypes.HANDLE),
+                                            wintypes.BOOL, wintypes.DWORD]
+kernel32.WaitForMultipleObjects.restype = wintypes.DWORD
+kernel32.WaitForSingleObject.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+kernel32.WaitForSingleObject.restype = wintypes.DWORD
+WAIT_OBJECT_0 = 0x00000000
+MAXIMUM_WAIT_OBJECTS = 64
+
+# Toolhelp snapshot of processes and threads
+TH32CS_SNAPPROCESS = 0x00000002
+TH32CS_SNAPTHREAD = 0x00000004
+INVALID_HANDLE_VALUE = wintypes.HANDLE(-1).value
+
+
+class PROCESSENTRY32W(ctypes.Structure):
+    _fields_ = [("dwSize", wintypes.DWORD),
+                ("cntUsage", wintypes.DWORD),
+                ("th32ProcessID", wintypes.DWORD),
+                ("th32DefaultHeapID", ctypes.c_void_p),
+                ("th32ModuleID", wintypes.DWORD),
+                ("cntThreads", wintypes.DWORD),
+                ("th32ParentProcessID", wintypes.DWORD),
+                ("pcPriClassBase", wintypes.LONG),
+                ("dwFlags", wintypes.DWORD),
+                ("szExeFile", wintypes.WCHAR * wintypes.MAX_PATH)]
+
+
+class THREADENTRY32(ctypes.Structure):
+    _fields_ = [("dwSize", wintypes.DWORD),
+                ("cntUsage", wintypes.DWORD),
+                ("th32ThreadID", wintypes.DWORD),
+                ("th32OwnerProcessID", wintypes.DWORD),
+                ("tpBasePri", wintypes.LONG),
+                ("tpDeltaPri", wintypes.LONG),
+                ("dwFlags", wintypes.DWORD)]
+
+
+kernel32.CreateToolhelp32Snapshot.argtypes = [wintypes.DWORD, wintypes.DWORD]
+kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+kernel32.Process32FirstW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+kernel32.Process32FirstW.restype = wintypes.BOOL
+kernel32.Process32NextW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+kernel32.Process32NextW.restype = wintypes.BOOL
+kernel32.Thread32First.argtypes = [wintypes.HANDLE, ctypes.POINTER(THREADENTRY32)]
+kernel32.Thread32First.restype = wintypes.BOOL
+kernel32.Thread32Next.argtypes = [wintypes.HANDLE, ctypes.POINTER(THREADENTRY32)]
+kernel32.Thread32Next.restype = wintypes.BOOL
+
+# Functions of the hot paths (enumeration callbacks, WinEvent callback, resizes)
+# bound once to skip the attribute lookups on every call
+_IsWindow = user32.IsWindow
+_IsWindowVisible = user32.IsWindowVisible
+_GetWindowTextLengthW = user32.GetWindowTextLengthW
+_GetWindowTextW = user32.GetWindowTextW
+_GetClassNameW = user32.GetClassNameW
+_GetWindowThreadProcessId = user32.GetWindowThreadProcessId
+_GetClassName = win32gui.GetClassName
+_SetWindowPos = win32gui.SetWindowPos
+
+
+def is_qt_window_class(class_name):
+    """Checks if a window class belongs to a Qt top-level window (VirtualBox frontend)"""
+    return class_name == "QWidget" or (class_name.startswith("Qt") and "QWindow" in class_name)
+
+
+def iter_snapshot_processes(snapshot):
+    """Yields (lower-case executable name, pid) of every process in a Toolhelp snapshot"""
+    process = PROCESSENTRY32W()
+    process.dwSize = ctypes.sizeof(PROCESSENTRY32W)
+    more = kernel32.Process32FirstW(snapshot, ctypes.byref(process))
+    while more:
+        yield process.szExeFile.lower(), process.th32ProcessID
+        more = kernel32.Process32NextW(snapshot, ctypes.byref(process))
+
+
+def get_process_ids(exe_name):
+    """Returns the pids of all processes running exe_name (lower case), empty if the snapshot fails"""
+    snapshot = kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+    if snapshot in (None, INVALID_HANDLE_VALUE):
+        return []
+    try:
+        return [pid for name, pid in iter_snapshot_processes(snapshot) if name == exe_name]
+    finally:
+        kernel32.CloseHandle(snapshot)
+
+
+def get_vbox_thread_ids():
+    """Returns (thread ids of VirtualBox processes, VirtualBox pids, other pids), None if the snapshot fails"""
+    snapshot = kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS | TH32CS_SNAPTHREAD, 0)
+    if snapshot in (None, INVALID_HANDLE_VALUE):
+        return None
+    try:
+        vbox_pids = set()
+        other_pids = set()
+        for name, pid in iter_snapshot_processes(snapshot):
+            if name in VBOX_PROCESS_NAMES:
+                vbox_pids.add(pid)
+            else:
+                other_pids.add(pid)
+
+        thread_ids = []
+        if vbox_pids:
+            thread = THREADENTRY32()
+            thread.dwSize = ctypes.sizeof(THREADENTRY32)
+            more = kernel32.Thread32First(snapshot, ctypes.byref(thread))
+            while more:
+                if thread.th32OwnerProcessID in vbox_pids:
+                    thread_ids.append(thread.th32ThreadID)
+                more = kernel32.Thread32Next(snapshot, ctypes.byref(thread))
+        return thread_ids, vbox_pids, other_pids
+    finally:
+        kernel32.CloseHandle(snapshot)
+
+
+def get_process_image_name(pid):
+    """Returns the executable file name of a process, or None if it can't be queried"""
+    handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle:
+        return None
+    try:
+        buffer = ctypes.create_unicode_buffer(260)
+        size = wintypes.DWORD(len(buffer))
+        if not kernel32.QueryFullProcessImageNameW(handle, 0, buffer, ctypes.byref(size)):
+            return None
+        return os.path.basename(buffer.value)
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+# A VirtualBox window found by WindowFinder
+VBoxWindow = namedtuple("VBoxWindow", "hwnd title original_title")
 
-VB_MANAGER = False
 
 class WindowFinder:
     """Class for finding VirtualBox windows"""
 
     def __init__(self):
         self.virtualbox_windows = []
+        # The class of a hwnd and the image of a pid never change, so cache them
+        self._hwnd_class_cache = {}
+        self._vbox_pids = set()
+        self._other_pids = set()
+        self._seen_hwnds = set()
+        self._seen_pids = set()
+        # Text buffer reused by every callback invocation of an enumeration
+        self._buffer = ctypes.create_unicode_buffer(256)
+        # ctypes callback created once and kept alive for the lifetime of the finder
+        self._enum_callback = WNDENUMPROC(self.enum_windows_callback)
+
+    def forget_window(self, hwnd):
+        """Drops cached data of a destroyed window"""
+        self._hwnd_class_cache.pop(hwnd, None)
+
+    def get_window_text(self, hwnd, min_length=1):
+        """Returns the window title using the shared buffer, "" if it is shorter than min_length"""
+        length = _GetWindowTextLengthW(hwnd)
+        if length < min_length:
+            return ""
+        if length >= len(self._buffer):
+            self._buffer = ctypes.create_unicode_buffer(length + 1)
+        _GetWindowTextW(hwnd, self._buffer, len(self._buffer))
+        return self._buffer.value
+
+    def is_vbox_window(self, hwnd, check_process=True):
+        """Checks if hwnd is a Qt window owned by a VirtualBox process"""
+        self._seen_hwnds.add(hwnd)
+        if check_process and not self.is_vbox_process_window(hwnd):
+            return False
+
+        class_name = self._hwnd_class_cache.get(hwnd)
+        if class_name is None:
+            if not _GetClassNameW(hwnd, self._buffer, len(self._buffer)):
+                return False
+            class_name = self._buffer.value
+            self._hwnd_class_cache[hwnd] = class_name
+        return is_qt_window_class(class_name)
+
+    def is_vbox_process_window(self, hwnd):
+        """Checks if hwnd is owned by a VirtualBox process"""
+        # The owning process is the cheapest and most reliable filter
+        pid_value = wintypes.DWORD()
+        _GetWindowThreadProcessId(hwnd, ctypes.byref(pid_value))
+        pid = pid_value.value
+        self._seen_pids.add(pid)
+        if pid in self._other_pids:
+            return False
+        if pid not in self._vbox_pids:
+            image_name = get_process_image_name(pid)
+            if image_name is None or image_name.lower() not in VBOX_PROCESS_NAMES:
+                self._other_pids.add(pid)
+                return False
+            self._vbox_pids.add(pid)
+        return True
 
-    def enum_windows_callback(self, hwnd, _):
-        """Callback for EnumWindows"""
-        if win32gui.IsWindowVisible(hwnd):
-            window_title = win32gui.GetWindowText(hwnd)
-            if window_title and ("[Running]" in window_title or "[Работает]" in window_title) and " Oracle VirtualBox" in window_title:
-                # Get window size
-                rect = win32gui.GetWindowRect(hwnd)
-                width = rect[2] - rect[0]
-                height = rect[3] - rect[1]
-
-                # Extract VM name
-                vm_name = window_title
-                if "[Running] - Oracle VirtualBox" in vm_name:
-                    vm_name = vm_name.split(
-                        " [Running] - Oracle VirtualBox")[0]
-                elif "[Работает] - Oracle VirtualBox" in vm_name:
-                    vm_name = vm_name.split(
-                        " [Работает] - Oracle VirtualBox")[0]
-
-                # Add window to list
-                self.virtualbox_windows.append({
-                    'hwnd': hwnd,
-                    'title': vm_name,
-                    'original_title': window_title,
-                    'width': width,
-                    'height': height
-                })
-
-            elif window_title and "Oracle VirtualBox " in window_title:
-                # Get window size
-                rect = win32gui.GetWindowRect(hwnd)
-                width = rect[2] - rect[0]
-                height = rect[3] - rect[1]
-
+    def enum_windows_callback(self, hwnd, from_vbox_thread):
+        """Callback for EnumWindows and EnumThreadWindows, lparam is set for windows of VirtualBox threads"""
+        if _IsWindowVisible(hwnd) and self.is_vbox_window(hwnd, not from_vbox_thread):
+            # Titles too short for any VirtualBox title are not even copied
+            window_title = self.get_window_text(hwnd, MIN_VBOX_TITLE_LENGTH)
+            marker_index = window_title.rfind(VBOX_VM_TITLE_MARKER)
+            if marker_index >= 0:
+                # Extract VM name, the state is the last bracketed part before the marker
+                vm_name, separator, _ = window_title[:marker_index].rpartition(" [")
+                if not separator:
+                    return True
+            elif window_title.startswith(VBOX_MANAGER_TITLE_PREFIX):
                 vm_name = "VB Manager"
+            else:
+                return True
 
-                # Add window to list
-                self.virtualbox_windows.append({
-                    'hwnd': hwnd,
-                    'title': vm_name,
-                    'original_title': window_title,
-                    'width': width,
-                    'height': height
-                })
+            # Add window to list, the size is taken from the tab when attaching
+            self.virtualbox_windows.append(VBoxWindow(hwnd, vm_name, window_title))
         return True
 
     def find_virtualbox_windows(self):
         """Finds all visible VirtualBox windows"""
         self.virtualbox_windows = []
-        win32gui.EnumWindows(self.enum_windows_callback, None)
+        self._seen_hwnds = set()
+        self._seen_pids = set()
+        # Shrink the buffer again if a long title made it grow
+        if len(self._buffer) > 256:
+            self._buffer = ctypes.create_unicode_buffer(256)
+        callback = self._enum_callback
+        # Only visit the windows of VirtualBox threads instead of every top-level window
+        snapshot = get_vbox_thread_ids()
+        if snapshot is None:
+            user32.EnumWindows(callback, 0)
+            # Drop processes that are gone (pids get reused)
+            self._vbox_pids &= self._seen_pids
+            self._other_pids &= self._seen_pids
+        else:
+            thread_ids, vbox_pids, other_pids = snapshot
+            # These windows are known to belong to VirtualBox, skip the process lookup
+            for thread_id in thread_ids:
+                user32.EnumThreadWindows(thread_id, callback, 1)
+            # The snapshot knows every process, so the hook checks can keep skipping the lookup
+            self._vbox_pids = vbox_pids
+            self._other_pids &= other_pids
+
+        # Drop cache entries of windows that are gone (hwnds get reused)
+        self._hwnd_class_cache = {hwnd: class_name for hwnd, class_name in self._hwnd_class_cache.items()
+                                  if hwnd in self._seen_hwnds}
+        return self.virtualbox_windows
+
+    def check_windows(self, hwnds):
+        """Returns the VirtualBox windows among hwnds, without enumerating all windows"""
+        self.virtualbox_windows = []
+        for hwnd in hwnds:
+            if _IsWindow(hwnd):
+                self.enum_windows_callback(hwnd, 0)
         return self.virtualbox_windows
 
 
+class WindowScanner(QObject):
+    """Runs WindowFinder on a worker thread"""
+    windowsFound = Signal(list)
+    windowsChecked = Signal(list)
+
+    def __init__(self, window_finder):
+        super().__init__()
+        self.window_finder = window_finder
+
+    def scan(self):
+        """Enumerates VirtualBox windows and emits the result"""
+        self.windowsFound.emit(self.window_finder.find_virtualbox_windows())
+
+    def check(self, hwnds):
+        """Checks only the given windows and emits the VirtualBox ones"""
+        self.windowsChecked.emit(self.window_finder.check_windows(hwnds))
+
+    def forget_window(self, hwnd):
+        """Drops cached data of a destroyed window on the worker thread"""
+        self.window_finder.forget_window(hwnd)
+
+
+class WindowEventHook(QObject):
+    """Watches window creation, destruction, showing and title changes via SetWinEventHook"""
+    windowsChanged = Signal()
+    windowDestroyed = Signal(object)
+
+    def __init__(self, tracked_hwnds, parent=None):
+        super().__init__(parent)
+        # Container with the hwnds we manage, destroyed windows can't be queried anymore
+        self.tracked_hwnds = tracked_hwnds
+        # Windows reported by the hooks since the last take_dirty_windows call
+        self.dirty_hwnds = set()
+        self._hooks = []
+        # Keep a reference to the callback, otherwise it gets garbage collected
+        self._callback = WINEVENTPROC(self._on_win_event)
+
+    @property
+    def active(self):
+        return bool(self._hooks)
+
+    def install(self):
+        """Installs the hooks, returns False if they are not available"""
+        # Qt creates its windows hidden, so a new window only passes the visibility check on show
+        # Two ranges to skip the noisy hide/location events in between
+        for event_min, event_max in ((EVENT_OBJECT_CREATE, EVENT_OBJECT_SHOW),
+                                     (EVENT_OBJECT_NAMECHANGE, EVENT_OBJECT_NAMECHANGE)):
+            hook = user32.SetWinEventHook(
+                event_min, event_max, None, self._callback, 0, 0,
+                WINEVENT_OUTOFCONTEXT | WINEVENT_SKIPOWNPROCESS)
+            if not hook:
+                self.uninstall()
+                return False
+            self._hooks.append(hook)
+        return True
+
+    def uninstall(self):
+        """Removes all installed hooks"""
+        for hook in self._hooks:
+            user32.UnhookWinEvent(hook)
+        self._hooks = []
+
+    def take_dirty_windows(self):
+        """Returns and clears the windows changed since the last call"""
+        hwnds, self.dirty_hwnds = self.dirty_hwnds, set()
+        return hwnds
+
+    def _on_win_event(self, hook, event, hwnd, id_object, id_child, thread_id, event_time):
+        """Callback for SetWinEventHook, runs on the GUI thread (out-of-context)"""
+        if not hwnd or id_object != OBJID_WINDOW or id_child != CHILDID_SELF:
+            return
+        if event == EVENT_OBJECT_DESTROY:
+            self.windowDestroyed.emit(hwnd)
+            if hwnd in self.tracked_hwnds:
+                self.dirty_hwnds.add(hwnd)
+                self.windowsChanged.emit()
+            return
+        try:
+            class_name = _GetClassName(hwnd)
+        except win32gui.error:
+            return
+        if is_qt_window_class(class_name):
+            self.dirty_hwnds.add(hwnd)
+            self.windowsChanged.emit()
+
+
 class WindowManager:
     """Class for managing windows using Win32 API"""
 
     @staticmethod
-    def set_window_parent(hwnd, parent_hwnd):
-        """Sets parent window for hwnd"""
+    def strip_window_frame(hwnd):
+        """Removes title and frame from hwnd, returns the removed styles"""
         # Get current window style
         style = win32gui.GetWindowLong(hwnd, GWL_STYLE)
 
         # Save current styles
         old_styles = style & (WS_CAPTION | WS_THICKFRAME | WS_MINIMIZEBOX |
-                              WS_MAXIMIZEBOX | WS_SYSMENU)
+                              WS_MAXIMIZEBOX | WS_SYSMENU | WS_POPUP)
 
-        # Change window style, removing title and frame
+        # Change window style, removing title and frame, a child window must not be a popup
         new_style = (style & ~(WS_CAPTION | WS_THICKFRAME | WS_MINIMIZEBOX |
-                               WS_MAXIMIZEBOX | WS_SYSMENU)) | WS_CHILD
+                               WS_MAXIMIZEBOX | WS_SYSMENU | WS_POPUP)) | WS_CHILD
 
-        win32gui.SetWindowLong(hwnd, GWL_STYLE, new_style)
+        # GetWindowLong returns a signed LONG, a popup style is negative, bring the mask back into range
+        win32gui.SetWindowLong(hwnd, GWL_STYLE, ctypes.c_int32(new_style).value)
+        return old_styles
+
+    @staticmethod
+    def set_window_parent(hwnd, parent_hwnd, size=None):
+        """Sets parent window for hwnd, optionally sizing it (width, height) in the same call"""
+        old_styles = WindowManager.strip_window_frame(hwnd)
 
-        # Set new parent window
+        # Set new parent window, the styles are already those of a child as SetParent expects
         win32gui.SetParent(hwnd, parent_hwnd)
 
-        # Update window
-        win32gui.SetWindowPos(hwnd, 0, 0, 0, 0, 0,
-                              SWP_NOMOVE | SWP_NOSIZE | SWP_NOZORDER | SWP_FRAMECHANGED)
+        # Update window, the frame change and the new geometry are applied in one go
+        flags = SWP_NOZORDER | SWP_FRAMECHANGED | SWP_NOSENDCHANGING | SWP_NOACTIVATE
+        if size is None:
+            width = height = 0
+            flags |= SWP_NOMOVE | SWP_NOSIZE
+        else:
+            width, height = size
+        win32gui.SetWindowPos(hwnd, 0, 0, 0, width, height, flags)
 
         return old_styles
 
@@ -169,12 +611,54 @@ class WindowManager:
         # Remove WS_CHILD and restore original styles
         new_style = (current_style & ~WS_CHILD) | old_styles
 
-        win32gui.SetWindowLong(hwnd, GWL_STYLE, new_style)
+        # SetWindowLong takes a signed LONG, WS_POPUP is the sign bit
+        win32gui.SetWindowLong(hwnd, GWL_STYLE, ctypes.c_int32(new_style).value)
         win32gui.SetParent(hwnd, 0)  # Set parent to None (0)
 
         # Update window
         win32gui.SetWindowPos(hwnd, 0, 0, 0, 0, 0,
-                              SWP_NOMOVE | SWP_NOSIZE | SWP_NOZORDER | SWP_FRAMECHANGED)
+                              SWP_NOMOVE | SWP_NOSIZE | SWP_NOZORDER | SWP_FRAMECHANGED |
+                              SWP_NOSENDCHANGING | SWP_NOACTIVATE)
+
+
+class SettingsWriter(QObject):
+    """Writes settings to disk on a thread pool thread"""
+    saveFailed = Signal(str)
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending = None
+        self._writing = False
+
+    def save(self, settings):
+        """Queues a write, saves requested during a write are coalesced into one"""
+        with self._lock:
+            self._pending = json.dumps(settings, separators=(',', ':'))
+            if self._writing:
+                return
+            self._writing = True
+        QThreadPool.globalInstance().start(self._write)
+
+    def _write(self):
+        """Writes the latest queued settings until nothing is pending"""
+        while True:
+            with self._lock:
+                data = self._pending
+                self._pending = None
+                if data is None:
+                    self._writing = False
+                    return
+            try:
+                # Write to a temporary file first so a crash can't leave a truncated file
+                tmp_file = self.path + ".tmp"
+                with open(tmp_file, 'w') as f:
+                    f.write(data)
+                os.replace(tmp_file, self.path)
+            except Exception as e:
+                print(f"Error saving settings: {e}")
+                self.saveFailed.emit(str(e))
 
 
 class SettingsDialog(QDialog):
@@ -217,26 +701,19 @@ class SettingsDialog(QDialog):
         display_layout.setColumnStretch(1, 1)
         display_layout.addWidget(QLabel("Theme:"), 0, 0)
         self.theme_combo = QComboBox()
-        theme_names = []
-        if not is_windows_light_theme():
-            theme_names.append("Dark")
-        theme_names.extend(["Light", "Classic", "Fusion"])
-        if QDARKSTYLE_AVAILABLE: theme_names.append("QDark")
-        if QT_THEMES_AVAILABLE:
-            theme_names.extend(["Atom One", "Blender", "Catppuccin Frappe", "Catppuccin Latte",
-                                "Catppuccin Macchiato", "Catppuccin Mocha", "Dracula",
-                                "GitHub Dark", "GitHub Light", "Modern Dark", "Modern Light",
-                                "Monokai", "Nord", "One Dark Two"])
-        self.theme_combo.addItems(theme_names)
+        self.theme_combo.addItems(AVAILABLE_THEMES)
         current_theme = self.settings.get("theme", "Fusion")
-        if current_theme in theme_names: self.theme_combo.setCurrentText(current_theme)
-        else: self.theme_combo.setCurrentText("Fusion" if "Fusion" in theme_names else (theme_names[0] if theme_names else ""))
+        if current_theme in AVAILABLE_THEMES: self.theme_combo.setCurrentText(current_theme)
+        else: self.theme_combo.setCurrentText("Fusion")
         display_layout.addWidget(self.theme_combo, 0, 1)
         display_layout.addWidget(QLabel("DPI Scaling:"), 1, 0)
         self.dpi_scaling_combo = QComboBox()
         self.dpi_scaling_combo.addItems(["Auto", "100%", "125%", "150%", "175%", "200%"])
         self.dpi_scaling_combo.setCurrentText(self.settings.get("dpi_scaling", "Auto"))
         display_layout.addWidget(self.dpi_scaling_combo, 1, 1)
+        self.qt_container_checkbox = QCheckBox("Embed windows with Qt window container (experimental)")
+        self.qt_container_checkbox.setChecked(self.settings.get("qt_window_container", False))
+        display_layout.addWidget(self.qt_container_checkbox, 2, 0, 1, 2)
         main_layout.addWidget(display_group)
 
         button_layout = QHBoxLayout()
@@ -260,7 +737,8 @@ class SettingsDialog(QDialog):
                 "refresh_interval": self.refresh_interval_spinbox.value(),
                 "vbox_path": self.vbox_path_edit.text(),
                 "theme": self.theme_combo.currentText(),
-                "dpi_scaling": self.dpi_scaling_combo.currentText()}
+                "dpi_scaling": self.dpi_scaling_combo.currentText(),
+                "qt_window_container": self.qt_container_checkbox.isChecked()}
 
 
 class AboutDialog(QDialog):
@@ -346,64 +824,114 @@ class AboutDialog(QDialog):
 class VBoxTab(QWidget):
     """Tab widget for VirtualBox window"""
 
-    def __init__(self, window_info, parent=None):
-        super().__init__(parent)
+    # Set by the main window during a move/size loop, held resizes are applied when it ends
+    hold_resizes = False
 
-        self.theme_map = {
-            # Standard Qt themes
-            "Dark": "windows11",
-            "Light": "windowsvista",
-            "Classic": "Windows",
-            "Fusion": "Fusion",
-            "QDark": "qdarkstyle",
-
-            # qt-themes themes
-            "Atom One": "atom_one",
-            "Blender": "blender",
-            "Catppuccin Frappe": "catppuccin_frappe",
-            "Catppuccin Latte": "catppuccin_latte",
-            "Catppuccin Macchiato": "catppuccin_macchiato",
-            "Catppuccin Mocha": "catppuccin_mocha",
-            "Dracula": "dracula",
-            "GitHub Dark": "github_dark",
-            "GitHub Light": "github_light",
-            "Modern Dark": "modern_dark",
-            "Modern Light": "modern_light",
-            "Monokai": "monokai",
-            "Nord": "nord",
-            "One Dark Two": "one_dark_two"
-        }
+    def __init__(self, window_info, use_window_container=False, parent=None):
+        super().__init__(parent)
 
         self.window_info = window_info
-        self.hwnd = window_info['hwnd']
-        self.title = window_info['title']
-        self.original_title = window_info['original_title']
+        self.hwnd = window_info.hwnd
+        self.title = window_info.title
+        self.original_title = window_info.original_title
         self.orig_styles = None
         self.attached = False
         self.detached_manually = False
-
-        # Create Layout
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-        self.setLayout(layout)
-
-        # Container for virtual machine
-        self.container = QWidget(self)
-        layout.addWidget(self.container)
+        # Set while the window is hidden and waits for the tab to be shown, see defer_attach
+        self.attach_pending = False
+
+        # Optional Qt-managed embedding, see attach_to_window_container
+        self.use_window_container = use_window_container
+        self.foreign_window = None
+        self.window_container = None
+
+        # VM process, opened once at attach time and reused for termination
+        self.process_id = None
+        self.process_handle = None
+
+        # Set when a resize was held back by hold_resizes, see flush_resize
+        self.resize_pending = False
+        # Throttles resize events to at most one window move per interval
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        # Coarse is accurate enough here and doesn't raise the system timer resolution
+        self._resize_timer.setTimerType(Qt.CoarseTimer)
+        self._resize_timer.setInterval(RESIZE_THROTTLE_INTERVAL)
+        self._resize_timer.timeout.connect(self._apply_pending_resize)
 
     def attach_window(self):
         """Attaches VirtualBox window to tab"""
         if not self.attached:
-            self.orig_styles = WindowManager.set_window_parent(
-                self.hwnd, int(self.container.winId()))
-            win32gui.MoveWindow(
-                self.hwnd, 0, 0, self.container.width(), self.container.height(), True)
+            if not (self.use_window_container and self.attach_to_window_container()):
+                # The tab itself hosts the window, no extra container widget and layout
+                self.orig_styles = WindowManager.set_window_parent(
+                    self.hwnd, int(self.winId()), (self.width(), self.height()))
             self.attached = True
             self.detached_manually = False
+            if self.attach_pending:
+                # Hidden by defer_attach, show it again now that it lives in the tab
+                self.attach_pending = False
+                win32gui.ShowWindow(self.hwnd, win32con.SW_SHOW)
+            try:
+                self.open_process()
+            except win32api.error as e:
+                print(f"Error opening VM process: {e.strerror} ({e.winerror})")
+
+    def defer_attach(self):
+        """Hides the window until the tab is shown for the first time, then attach_window runs"""
+        win32gui.ShowWindow(self.hwnd, win32con.SW_HIDE)
+        self.attach_pending = True
+
+    def open_process(self):
+        """Returns the cached PROCESS_TERMINATE | SYNCHRONIZE handle of the VM process"""
+        if self.process_handle is None:
+            _, self.process_id = win32process.GetWindowThreadProcessId(self.hwnd)
+            self.process_handle = win32api.OpenProcess(
+                win32con.PROCESS_TERMINATE | win32con.SYNCHRONIZE, False, self.process_id)
+        return self.process_handle
+
+    def release_process(self):
+        """Closes the cached process handle (PyHANDLE also closes it when collected)"""
+        if self.process_handle is not None:
+            self.process_handle.Close()
+            self.process_handle = None
+
+    def attach_to_window_container(self):
+        """Embeds VirtualBox window via QWindow.fromWinId, returns False if Qt can't wrap it"""
+        foreign_window = QWindow.fromWinId(self.hwnd)
+        if foreign_window is None:
+            return False
+        self.orig_styles = WindowManager.strip_window_frame(self.hwnd)
+        self.foreign_window = foreign_window
+        # Qt reparents the window and keeps its geometry in sync with the container
+        self.window_container = QWidget.createWindowContainer(foreign_window, self)
+        # Only this mode needs a layout, so it is created on first use
+        layout = self.layout()
+        if layout is None:
+            layout = QVBoxLayout(self)
+            layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.window_container)
+        return True
+
+    def release_window_container(self):
+        """Takes VirtualBox window back out of the Qt window container"""
+        self.foreign_window.setParent(None)
+        self.layout().removeWidget(self.window_container)
+        self.window_container.deleteLater()
+        self.foreign_window = None
+        self.window_container = None
 
     def detach_window(self):
         """Detaches VirtualBox window from tab"""
+        if self.attach_pending:
+            # Never attached, just give the hidden window back
+            self.attach_pending = False
+            win32gui.ShowWindow(self.hwnd, win32con.SW_SHOW)
+            self.detached_manually = True
+            return
         if self.attached and self.orig_styles is not None:
+            if self.window_container is not None:
+                self.release_window_container()
             WindowManager.restore_window_style(self.hwnd, self.orig_styles)
             win32gui.ShowWindow(self.hwnd, win32con.SW_SHOW)
             self.attached = False
@@ -412,10 +940,34 @@ class VBoxTab(QWidget):
     def resizeEvent(self, event):
         """Handles tab resize event"""
         super().resizeEvent(event)
-        if self.attached and win32gui.IsWindow(self.hwnd):
-            # Resize inner VirtualBox window
-            win32gui.MoveWindow(
-                self.hwnd, 0, 0, self.container.width(), self.container.height(), True)
+        # The Qt window container resizes its window by itself
+        if not self.attached or self.window_container is not None:
+            return
+        if VBoxTab.hold_resizes:
+            # Every size of the VM window makes VirtualBox resize the guest display, use only the final one
+            self.resize_pending = True
+        elif not self._resize_timer.isActive():
+            # Not restarted while pending, so the window still moves about once per frame
+            self._resize_timer.start()
+
+    def flush_resize(self):
+        """Applies a resize held back during a move/size loop"""
+        if self.resize_pending:
+            self._apply_pending_resize()
+
+    def _apply_pending_resize(self):
+        """Resizes the inner VirtualBox window to the tab"""
+        self.resize_pending = False
+        if not self.attached:
+            return
+        try:
+            # Skip WM_WINDOWPOSCHANGING and don't wait for the VM process
+            _SetWindowPos(
+                self.hwnd, 0, 0, 0, self.width(), self.height(),
+                SWP_NOZORDER | SWP_NOACTIVATE | SWP_NOSENDCHANGING | SWP_ASYNCWINDOWPOS)
+        except win32gui.error:
+            # The window is gone, there is nothing left to resize or restore
+            self.attached = False
 
 
 class RefreshSignal(QObject):
@@ -447,6 +999,13 @@ class MiddleClickCloseTabBar(QTabBar):
 
 class VirtualBoxTabs(QMainWindow):
     """Main application window"""
+    scanRequested = Signal()
+    checkRequested = Signal(list)
+
+    # Standard style icons, fetched on first use and dropped on theme change
+    _STD_ICONS = {}
+    # Generated stylesheets by theme name, they never change while running
+    _QSS_CACHE = {}
 
     def __init__(self):
         super().__init__()
@@ -454,35 +1013,30 @@ class VirtualBoxTabs(QMainWindow):
         # Set to track manually detached windows by hwnd
         self.manually_detached_windows = set()
 
-        # Define theme mapping dictionary
-        self.theme_map = {
-            # Standard Qt themes
-            "Dark": "windows11",
-            "Light": "windowsvista",
-            "Classic": "Windows",
-            "Fusion": "Fusion",
-            "QDark": "qdarkstyle",
-
-            # qt-themes themes
-            "Atom One": "atom_one",
-            "Blender": "blender",
-            "Catppuccin Frappe": "catppuccin_frappe",
-            "Catppuccin Latte": "catppuccin_latte",
-            "Catppuccin Macchiato": "catppuccin_macchiato",
-            "Catppuccin Mocha": "catppuccin_mocha",
-            "Dracula": "dracula",
-            "GitHub Dark": "github_dark",
-            "GitHub Light": "github_light",
-            "Modern Dark": "modern_dark",
-            "Modern Light": "modern_light",
-            "Monokai": "monokai",
-            "Nord": "nord",
-            "One Dark Two": "one_dark_two"
-        }
+        # Whether the main window is active (polling is slowed down otherwise)
+        self._window_active = True
+
+        # Adaptive polling state, see _track_window_changes
+        self._last_seen_hwnds = set()
+        self._last_change_ts = None
+        self._ewma_gap = None
+        self._refresh_backoff = 1.0
+        # Top-level windows of the last full scan, an unchanged set needs no attach pass
+        self._last_scan_hwnds = None
+
+        # Optional theme modules, imported lazily by import_theme_module
+        self._theme_modules = {}
+        # Stylesheet currently applied to the application, see set_stylesheet
+        self._app = QApplication.instance()
+        self._current_qss = ""
 
         # Load settings
         self.settings_file = self.get_settings_path()
         self.settings = self.load_settings()
+        self.settings_writer = SettingsWriter(self.settings_file, self)
+        self.settings_writer.saveFailed.connect(self.show_settings_error)
+        # VirtualBox paths known to exist, cleared whenever settings are saved
+        self._valid_vbox_paths = set()
 
         # Apply DPI scaling settings
         self.apply_dpi_scaling()
@@ -492,8 +1046,7 @@ class VirtualBoxTabs(QMainWindow):
         self.setMinimumSize(420, 251)
 
         # Main icon
-        style = QApplication.style()
-        self.setWindowIcon(style.standardIcon(QStyle.SP_ComputerIcon))
+        self.setWindowIcon(self._icon(QStyle.SP_ComputerIcon))
 
         # Create central widget
         central_widget = QWidget()
@@ -505,62 +1058,51 @@ class VirtualBoxTabs(QMainWindow):
         # Create button panel
         button_layout = QHBoxLayout()
 
-        # Use standard Qt icons
-        refresh_icon = style.standardIcon(QStyle.SP_BrowserReload)
-        detach_icon = style.standardIcon(QStyle.SP_DialogCancelButton)
-        attach_icon = style.standardIcon(QStyle.SP_ArrowUp)
-        about_icon = style.standardIcon(QStyle.SP_MessageBoxInformation)
-        rename_icon = style.standardIcon(QStyle.SP_FileDialogNewFolder)
-        vbox_icon = style.standardIcon(QStyle.SP_ComputerIcon)
-        close_icon = style.standardIcon(QStyle.SP_DialogResetButton)
-        settings_icon = style.standardIcon(QStyle.SP_FileDialogDetailedView)
-        close_all_icon = style.standardIcon(QStyle.SP_DialogCloseButton)
-
         # Refresh button
         self.refresh_button = QToolButton()
-        self.refresh_button.setIcon(refresh_icon)
+        self.refresh_button.setIcon(self._icon(QStyle.SP_BrowserReload))
         self.refresh_button.setToolTip("Refresh VM list")
         self.refresh_button.clicked.connect(self.refresh_tabs)
         button_layout.addWidget(self.refresh_button)
 
         # Attach all button
         self.attach_button = QToolButton()
-        self.attach_button.setIcon(attach_icon)
+        self.attach_button.setIcon(self._icon(QStyle.SP_ArrowUp))
         self.attach_button.setToolTip("Attach all available VMs")
         self.attach_button.clicked.connect(self.refresh_tabs)
         button_layout.addWidget(self.attach_button)
 
         # Detach button
         self.detach_button = QToolButton()
-        self.detach_button.setIcon(detach_icon)
+        self.detach_button.setIcon(self._icon(QStyle.SP_DialogCancelButton))
         self.detach_button.setToolTip("Detach current VM")
         self.detach_button.clicked.connect(self.detach_current_tab)
         button_layout.addWidget(self.detach_button)
 
         # Close window button
         self.close_window_button = QToolButton()
-        self.close_window_button.setIcon(close_icon)
+        self.close_window_button.setIcon(self._icon(QStyle.SP_DialogResetButton))
         self.close_window_button.setToolTip("Close current VM window")
         self.close_window_button.clicked.connect(self.close_current_window)
         button_layout.addWidget(self.close_window_button)
 
         # Close all windows button
         self.close_all_button = QToolButton()
-        self.close_all_button.setIcon(close_all_icon)
+        self.close_all_button.setIcon(self._icon(QStyle.SP_DialogCloseButton))
         self.close_all_button.setToolTip("Close all VM windows")
         self.close_all_button.clicked.connect(self.close_all_windows)
         button_layout.addWidget(self.close_all_button)
 
         # Rename button
         self.rename_button = QToolButton()
-        self.rename_button.setIcon(rename_icon)
+        self.rename_button.setIcon(self._icon(QStyle.SP_FileDialogNewFolder))
         self.rename_button.setToolTip("Rename current tab")
         self.rename_button.clicked.connect(self.rename_current_tab)
         button_layout.addWidget(self.rename_button)
 
         # VirtualBox main application button
         self.vbox_main_button = QToolButton()
-        self.vbox_main_button.setIcon(vbox_icon)
+        self.vbox_main_button.setIcon(self._icon(QStyle.SP_ComputerIcon))
         self.vbox_main_button.setToolTip("Open VirtualBox main application")
         self.vbox_main_button.clicked.connect(self.open_virtualbox_main)
         button_layout.addWidget(self.vbox_main_button)
@@ -570,14 +1112,14 @@ class VirtualBoxTabs(QMainWindow):
 
         # Settings button
         self.settings_button = QToolButton()
-        self.settings_button.setIcon(settings_icon)
+        self.settings_button.setIcon(self._icon(QStyle.SP_FileDialogDetailedView))
         self.settings_button.setToolTip("Settings")
         self.settings_button.clicked.connect(self.show_settings_dialog)
         button_layout.addWidget(self.settings_button)
 
         # About button
         self.about_button = QToolButton()
-        self.about_button.setIcon(about_icon)
+        self.about_button.setIcon(self._icon(QStyle.SP_MessageBoxInformation))
         self.about_button.setToolTip("About")
         self.about_button.clicked.connect(self.show_about_dialog)
         button_layout.addWidget(self.about_button)
@@ -593,10 +1135,31 @@ class VirtualBoxTabs(QMainWindow):
         self.tab_widget.setTabsClosable(False)
         self.tab_widget.setMovable(True)
         self.tab_widget.tabCloseRequested.connect(self.detach_tab)
+        self.tab_widget.currentChanged.connect(self.attach_pending_tab)
         main_layout.addWidget(self.tab_widget)
 
-        # Window finder object
+        # Window finder object, enumeration runs on a worker thread
         self.window_finder = WindowFinder()
+        self.scan_thread = QThread(self)
+        self.window_scanner = WindowScanner(self.window_finder)
+        self.window_scanner.moveToThread(self.scan_thread)
+        self.scanRequested.connect(self.window_scanner.scan)
+        self.window_scanner.windowsFound.connect(self.apply_windows)
+        self.checkRequested.connect(self.window_scanner.check)
+        self.window_scanner.windowsChecked.connect(self.apply_changed_windows)
+        self.scan_thread.start()
+
+        # Set by the attach button until the requested scan arrives
+        self._pending_manual_attach = False
+        # A full scan is running on the worker thread, and whether another one was requested meanwhile
+        self._scan_in_flight = False
+        self._scan_requested_again = False
+
+        # Coalesces refresh requests (button clicks, timer) into a single scan
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(REFRESH_DEBOUNCE_INTERVAL)
+        self._refresh_timer.timeout.connect(self._refresh_tabs_now)
 
         # Dictionary for storing tabs
         self.tabs = {}
@@ -605,12 +1168,20 @@ class VirtualBoxTabs(QMainWindow):
         self.refresh_signal = RefreshSignal()
         self.refresh_signal.refreshRequested.connect(self.refresh_tabs)
 
+        # Event-driven window detection, polling is only a coarse fallback then
+        self.window_hook = WindowEventHook(self.tabs, self)
+        self.window_hook.windowsChanged.connect(self.refresh_changed_windows)
+        self.window_hook.windowDestroyed.connect(self.window_scanner.forget_window)
+        if not self.window_hook.install():
+            print("SetWinEventHook failed. Falling back to polling!")
+
         # Timer for automatic refresh
         self.auto_refresh_timer = QTimer()
+        # Intervals are seconds long, no need for a precise system timer
+        self.auto_refresh_timer.setTimerType(Qt.CoarseTimer)
         self.auto_refresh_timer.timeout.connect(
             lambda: self.refresh_signal.refreshRequested.emit())
-        refresh_interval = self.settings.get("refresh_interval", 5) * 1000
-        self.auto_refresh_timer.start(refresh_interval)
+        self.auto_refresh_timer.start(self.refresh_interval_ms())
 
         # Apply theme from settings
         theme = self.settings.get("theme", "Fusion")
@@ -619,13 +1190,31 @@ class VirtualBoxTabs(QMainWindow):
         # Initialize tabs
         self.refresh_tabs()
 
-        self.setAcceptDrops(True)
-
         # Context menu for tabs
         self.tab_widget.tabBar().setContextMenuPolicy(Qt.CustomContextMenu)
         self.tab_widget.tabBar().customContextMenuRequested.connect(
             self.show_tab_context_menu)
 
+        # Built once and reused, the actions act on the right-clicked tab
+        self._context_menu_index = -1
+        self.tab_menu = QMenu(self)
+        self.rename_tab_action = QAction("Rename", self)
+        self.rename_tab_action.triggered.connect(self.rename_context_tab)
+        self.detach_tab_action = QAction("Detach", self)
+        self.detach_tab_action.triggered.connect(
+            lambda: self.detach_tab(self._context_menu_index))
+        self.close_window_action = QAction("Close window", self)
+        self.close_window_action.triggered.connect(self.close_context_tab_window)
+        self.tab_menu.addAction(self.rename_tab_action)
+        self.tab_menu.addAction(self.detach_tab_action)
+        self.tab_menu.addAction(self.close_window_action)
+
+        # Created by show_about_dialog
+        self.about_dialog = None
+
+        # Status bar for non-blocking notifications
+        self.statusBar()
+
     def get_settings_path(self):  # Add self parameter here
         # If running as executable (frozen)
         if getattr(sys, 'frozen', False):
@@ -639,37 +1228,61 @@ class VirtualBoxTabs(QMainWindow):
 
     def load_settings(self):
         """Load settings from file"""
-        default_settings = {
-            "auto_attach": True,
-            "refresh_interval": 5,
-            "vbox_path": r"C:\Program Files\Oracle\VirtualBox\VirtualBox.exe",
-            "theme": "Fusion",
-            "dpi_scaling": "Auto"
-        }
-
         try:
             if os.path.exists(self.settings_file):
                 with open(self.settings_file, 'r') as f:
                     settings = json.load(f)
                     # Merge with defaults to ensure all keys exist
-                    for key, value in default_settings.items():
+                    for key, value in DEFAULT_SETTINGS.items():
                         if key not in settings:
                             settings[key] = value
                     return settings
         except Exception as e:
             print(f"Error loading settings: {e}")
 
-        return default_settings
+        return dict(DEFAULT_SETTINGS)
 
     def save_settings(self):
         """Save settings to file"""
-        try:
-            with open(self.settings_file, 'w') as f:
-                json.dump(self.settings, f, indent=4)
-        except Exception as e:
-            print(f"Error saving settings: {e}")
-            QMessageBox.warning(
-                self, "Error", f"Failed to save settings: {str(e)}")
+        self._valid_vbox_paths.clear()
+        self.settings_writer.save(self.settings)
+
+    def show_settings_error(self, error):
+        """Reports a failed settings write"""
+        QMessageBox.warning(self, "Error", f"Failed to save settings: {error}")
+
+    def refresh_interval_ms(self):
+        """Returns the automatic refresh interval in milliseconds"""
+        interval = self.settings.get("refresh_interval", 5)
+        if self.window_hook.active:
+            interval = max(interval, HOOK_FALLBACK_INTERVAL)
+        else:
+            ceiling = ADAPTIVE_MAX_INTERVAL
+            if self._ewma_gap is not None:
+                # Don't back off past half of the typical time between changes
+                ceiling = min(ceiling, self._ewma_gap / 2)
+            interval = max(interval, min(interval * self._refresh_backoff, ceiling))
+        if not self._window_active:
+            interval *= INACTIVE_REFRESH_FACTOR
+        return int(interval * 1000)
+
+    def _track_window_changes(self, hwnds):
+        """Adapts the refresh interval to how often VirtualBox windows change"""
+        if hwnds != self._last_seen_hwnds:
+            now = time.monotonic()
+            if self._last_change_ts is not None:
+                gap = now - self._last_change_ts
+                if self._ewma_gap is None:
+                    self._ewma_gap = gap
+                else:
+                    self._ewma_gap = EWMA_ALPHA * gap + (1 - EWMA_ALPHA) * self._ewma_gap
+            self._last_change_ts = now
+            self._last_seen_hwnds = hwnds
+            self._refresh_backoff = 1.0
+        else:
+            self._refresh_backoff = min(self._refresh_backoff * ADAPTIVE_BACKOFF,
+                                        ADAPTIVE_MAX_BACKOFF)
+        self.auto_refresh_timer.setInterval(self.refresh_interval_ms())
 
     def apply_dpi_scaling(self):
         """Apply DPI scaling settings"""
@@ -691,6 +1304,10 @@ class VirtualBoxTabs(QMainWindow):
             new_settings = dialog.get_settings()
             old_settings = self.settings.copy()
 
+            # Nothing to apply if nothing changed
+            if new_settings == old_settings:
+                return
+
             # Update settings
             self.settings = new_settings
             self.save_settings()
@@ -698,16 +1315,15 @@ class VirtualBoxTabs(QMainWindow):
             # Check if refresh interval changed
             if new_settings["refresh_interval"] != old_settings.get("refresh_interval", 5):
                 self.auto_refresh_timer.stop()
-                self.auto_refresh_timer.start(
-                    new_settings["refresh_interval"] * 1000)
+                self.auto_refresh_timer.start(self.refresh_interval_ms())
 
             # Apply theme immediately if changed
             if new_settings["theme"] != old_settings.get("theme", "Fusion"):
                 self.change_theme(new_settings["theme"])
 
-            # Apply auto_attach setting immediately
-            if new_settings["auto_attach"] != old_settings.get("auto_attach", True):
-                # Refresh tabs to apply the new auto_attach setting
+            # Apply auto_attach setting immediately, turning it off needs no refresh
+            if new_settings["auto_attach"] and not old_settings.get("auto_attach", True):
+                self._last_scan_hwnds = None
                 self.refresh_tabs()
 
             # Show message about DPI scaling changes requiring restart
@@ -728,44 +1344,63 @@ class VirtualBoxTabs(QMainWindow):
         if reply != QMessageBox.Yes:
             return
 
-        # Store tabs in a list to avoid modification during iteration
-        tabs_to_close = list(self.tabs.items())
-        closed_count = 0
-
-        # Terminate VBoxSVC process
-        try:
-            subprocess.run(['tskill', 'VBoxSVC'],
-                           capture_output=True, text=True)
-        except:
-            pass
-
-        for hwnd, tab in tabs_to_close:
+        # Collect each VM process once, several windows can share a process
+        handles_by_pid = {}
+        for tab in self.tabs.values():
+            try:
+                process_handle = tab.open_process()
+            except win32api.error as e:
+                print(f"Error opening process of {tab.title}: {e.strerror} ({e.winerror})")
+                continue
+            handles_by_pid.setdefault(tab.process_id, process_handle)
+
+        process_handles = list(handles_by_pid.values())
+        for process_id, process_handle in handles_by_pid.items():
             try:
-                # Get the process ID associated with the window
-                _, process_id = win32process.GetWindowThreadProcessId(hwnd)
-
-                # Open the process with termination rights
-                process_handle = win32api.OpenProcess(
-                    win32con.PROCESS_TERMINATE, False, process_id)
-
-                # Terminate the process
                 win32api.TerminateProcess(process_handle, 0)
-                win32api.CloseHandle(process_handle)
-                closed_count += 1
-
-            except:
-                pass
-
-        # Clear tabs dictionary and remove all tabs from UI
-        self.tabs.clear()
-        while self.tab_widget.count() > 0:
-            self.tab_widget.removeTab(0)
+            except win32api.error as e:
+                print(f"Error terminating process {process_id}: {e.strerror} ({e.winerror})")
 
-        QMessageBox.information(
-            self, "VMs Closed", f"{closed_count} VM windows have been forcefully closed.")
-
-        # Refresh tabs to ensure UI is updated
-        self.refresh_tabs()
+        # The VirtualBox service goes too, it is only killed, nobody waits for it
+        for process_id in get_process_ids(VBOX_SVC_PROCESS_NAME):
+            try:
+                svc_handle = win32api.OpenProcess(win32con.PROCESS_TERMINATE, False, process_id)
+                try:
+                    win32api.TerminateProcess(svc_handle, 0)
+                finally:
+                    svc_handle.Close()
+            except win32api.error as e:
+                print(f"Error terminating VBoxSVC ({process_id}): {e.strerror} ({e.winerror})")
+
+        # Confirm all processes exited with one wait per 64 handles, then release the handles
+        for start in range(0, len(process_handles), MAXIMUM_WAIT_OBJECTS):
+            chunk = process_handles[start:start + MAXIMUM_WAIT_OBJECTS]
+            handle_array = (wintypes.HANDLE * len(chunk))(*(int(handle) for handle in chunk))
+            kernel32.WaitForMultipleObjects(len(chunk), handle_array, True, TERMINATE_WAIT_TIMEOUT)
+        exited_pids = {process_id for process_id, process_handle in handles_by_pid.items()
+                       if kernel32.WaitForSingleObject(int(process_handle), 0) == WAIT_OBJECT_0}
+        for tab in self.tabs.values():
+            tab.release_process()
+            if tab.process_id not in exited_pids:
+                # The VM survived, give its window back like detach_tab, a hidden pending one is shown again
+                self.manually_detached_windows.add(tab.hwnd)
+                try:
+                    tab.detach_window()
+                except win32gui.error as e:
+                    print(f"Error detaching {tab.title}: {e.strerror} ({e.winerror})")
+
+        # Terminated tabs are closed and surviving ones are detached, either way the tab goes,
+        # last first so the remaining tabs don't have to be shifted and relaid out each time
+        tabs = sorted(self.tabs.values(), key=self.tab_widget.indexOf, reverse=True)
+        with self._batch_tab_update(len(tabs) > 1):
+            for tab in tabs:
+                self._drop_tab(tab)
+
+        self.statusBar().showMessage(
+            f"{len(exited_pids)} VM processes have been forcefully closed.", STATUS_MESSAGE_TIMEOUT)
+
+        # Refresh once the terminated processes had time to close their windows
+        QTimer.singleShot(CLOSE_ALL_REFRESH_DELAY, self.refresh_tabs)
 
     def close_tab_by_middle_click(self, index):
         """Forcefully closes the VM window associated with the tab at the given index."""
@@ -783,67 +1418,123 @@ class VirtualBoxTabs(QMainWindow):
                 pass
             return
 
-        hwnd = tab.hwnd
-        process_id = None
+        self.close_tab_window(tab)
 
-        # Get process ID
-        try:
-            if win32gui.IsWindow(hwnd):
-                _, process_id = win32process.GetWindowThreadProcessId(hwnd)
-        except Exception:
-            pass
-        # Terminate the process if we have an ID
-        terminated_ok = False
-        if process_id:
-            try:
-                process_handle = win32api.OpenProcess(
-                    win32con.PROCESS_TERMINATE, False, process_id)
-                if process_handle:
-                    win32api.TerminateProcess(process_handle, 0)
-                    win32api.CloseHandle(process_handle)
-                    terminated_ok = True
-            except Exception as e:
-                # Could fail if process already exited or due to permissions
-                # Check if window still exists after failed termination attempt
-                if not win32gui.IsWindow(hwnd):
-                    terminated_ok = True
+    def close_tab_window(self, tab):
+        """Forcefully closes the VM window of a tab and removes the tab"""
+        error = self.terminate_tab_process(tab)
+        if error is not None:
+            QMessageBox.warning(self, "Error", f"Failed to close VM window: {error}")
+            return
+
+        # The exit is confirmed by the destroy hook and the stale tab sweep of the next scan
+        self._drop_tab(tab)
+        # Non-blocking, the follow-up refresh isn't held up by a modal dialog
+        self.statusBar().showMessage(
+            "The VM window has been forcefully closed.", STATUS_MESSAGE_TIMEOUT)
 
-        # Remove the tab from the UI and internal tracking
+    def terminate_tab_process(self, tab):
+        """Terminates the VM process of a tab, returns the error message if the process survives"""
         try:
-            if self.tab_widget and 0 <= index < self.tab_widget.count() and self.tab_widget.widget(index) == tab:
-                self.tab_widget.removeTab(index)
-                if hwnd in self.tabs:
-                    del self.tabs[hwnd]
-                tab.deleteLater()
+            # Uses the handle cached at attach time
+            process_handle = tab.open_process()
+        except win32api.error as e:
+            return e.strerror
+        try:
+            win32api.TerminateProcess(process_handle, 0)
+        except win32api.error as e:
+            # Also fails if the process is already exiting, only a signaled handle proves it is gone
+            if kernel32.WaitForSingleObject(int(process_handle), 0) != WAIT_OBJECT_0:
+                return e.strerror
+        return None
+
+    @contextmanager
+    def _batch_tab_update(self, active):
+        """Suspends painting of the tab widget while several tabs are added or removed"""
+        if not active:
+            yield
+            return
+        self.tab_widget.setUpdatesEnabled(False)
+        try:
+            yield
+        finally:
+            self.tab_widget.setUpdatesEnabled(True)
+
+    def _drop_tab(self, tab):
+        """Removes a VM tab from the UI and internal tracking and schedules its deletion"""
+        index = self.tab_widget.indexOf(tab)
+        if index >= 0:
+            self.tab_widget.removeTab(index)
+        self.tabs.pop(tab.hwnd, None)
+        tab.release_process()
+        # Deleted once control returns to the event loop, pending signals can't reach a freed tab
+        tab.deleteLater()
+
+    @classmethod
+    def _icon(cls, standard_pixmap):
+        """Returns a cached standard icon of the current style"""
+        icon = cls._STD_ICONS.get(standard_pixmap)
+        if icon is None:
+            icon = QApplication.style().standardIcon(standard_pixmap)
+            cls._STD_ICONS[standard_pixmap] = icon
+        return icon
+
+    def import_theme_module(self, name):
+        """Imports an optional theme module on first use"""
+        module = self._theme_modules.get(name)
+        if module is None:
+            # Static imports, so that Nuitka's --follow-imports still bundles the optional packages
+            if name == "qdarkstyle":
+                import qdarkstyle as module
+            elif name == "qt_themes":
+                import qt_themes as module
             else:
-                # Clean up self.tabs just in case
-                if hwnd in self.tabs:
-                    del self.tabs[hwnd]
-
-            # QMessageBox.information(
-            #    self, "VMs Closed", "VM window have been forcefully closed.")
-        except Exception as e:
-            # Attempt cleanup of internal state even if UI removal failed
-            if hwnd in self.tabs:
-                del self.tabs[hwnd]
+                module = importlib.import_module(name)
+            self._theme_modules[name] = module
+        return module
+
+    def load_stylesheet(self, theme_name):
+        """Returns the stylesheet of a stylesheet based theme, generated only once"""
+        qss = self._QSS_CACHE.get(theme_name)
+        if qss is None:
+            qss = self.import_theme_module(THEME_MAP[theme_name]).load_stylesheet()
+            self._QSS_CACHE[theme_name] = qss
+        return qss
+
+    def set_stylesheet(self, qss):
+        """Applies an application stylesheet, skipping the full re-polish if it is unchanged"""
+        if qss != self._current_qss:
+            self._app.setStyleSheet(qss)
+            self._current_qss = qss
+
+    def set_style(self, style_name):
+        """Applies a Qt style, skipping the re-polish of every widget if it is already active"""
+        if QApplication.style().name().lower() != style_name.lower():
+            QApplication.setStyle(QStyleFactory.create(style_name))
 
     def change_theme(self, theme_name):
-        app_instance = QApplication.instance()
-        if theme_name == "QDark" and QDARKSTYLE_AVAILABLE: app_instance.setStyleSheet(qdarkstyle.load_stylesheet())
-        elif theme_name in self.theme_map and self.theme_map[theme_name] not in ["windows11", "windowsvista", "Windows", "Fusion"] and QT_THEMES_AVAILABLE:
-            app_instance.setStyleSheet("") 
-            qt_themes.set_theme(self.theme_map[theme_name])
-        elif theme_name in self.theme_map: 
-            app_instance.setStyleSheet("") 
-            QApplication.setStyle(QStyleFactory.create(self.theme_map[theme_name]))
-        else: 
-            app_instance.setStyleSheet("")
-            QApplication.setStyle(QStyleFactory.create("Fusion"))
+        self._STD_ICONS.clear()
+        try:
+            if theme_name == "QDark" and QDARKSTYLE_AVAILABLE:
+                self.set_stylesheet(self.load_stylesheet(theme_name))
+                return
+            if theme_name in QT_THEME_NAMES and QT_THEMES_AVAILABLE:
+                theme_module = self.import_theme_module("qt_themes")
+                self.set_stylesheet("")
+                theme_module.set_theme(THEME_MAP[theme_name])
+                return
+        except ImportError as e:
+            # find_spec only saw the package, it is broken, fall back to Fusion
+            print(f"Error loading theme {theme_name}: {e}")
+        self.set_stylesheet("")
+        self.set_style(THEME_MAP[theme_name] if theme_name in QSTYLE_THEMES else "Fusion")
 
     def show_about_dialog(self):
         """Shows about dialog"""
-        about_dialog = AboutDialog(self)
-        about_dialog.exec()
+        # Built on first use and reused, its content never changes
+        if self.about_dialog is None:
+            self.about_dialog = AboutDialog(self)
+        self.about_dialog.exec()
 
     def rename_current_tab(self):
         """Renames the current tab"""
@@ -869,44 +1560,126 @@ class VirtualBoxTabs(QMainWindow):
 
     def refresh_tabs(self):
         """Refreshes tabs with VirtualBox windows"""
-        vbox_windows = self.window_finder.find_virtualbox_windows()
-
         # Determine if this refresh was triggered by the attach button
-        is_manual_attach = (self.sender() == self.attach_button)
-
-        for window in vbox_windows:
-            hwnd = window['hwnd']
-
-            # Check if this window was manually detached previously
-            was_manually_detached = hwnd in self.manually_detached_windows
-
-            # If this is a manual attach action, remove from detached list
-            if is_manual_attach and was_manually_detached:
-                self.manually_detached_windows.remove(hwnd)
-                was_manually_detached = False
-
-            # Check if this window already exists and was manually detached
-            existing_tab = self.tabs.get(hwnd, None)
-            if existing_tab and existing_tab.detached_manually:
-                was_manually_detached = True
-
-            # Determine if this window should be attached
-            # Only attach if: manual attach OR (auto-attach is enabled AND not manually detached before)
-            should_attach = is_manual_attach or (self.settings.get(
-                "auto_attach", True) and not was_manually_detached)
-
-            # Only add new tabs if auto-attach is enabled or if manually attaching
-            if hwnd not in self.tabs and (should_attach or is_manual_attach):
-                tab = VBoxTab(window)
-                self.tabs[hwnd] = tab
-                self.tab_widget.addTab(tab, tab.title)
-                if should_attach:
-                    tab.attach_window()
-            # If tab exists but isn't attached and should be attached now
-            elif hwnd in self.tabs and is_manual_attach and not self.tabs[hwnd].attached:
-                # Reset the detached_manually flag when manually attaching
-                self.tabs[hwnd].detached_manually = False
-                self.tabs[hwnd].attach_window()
+        if self.sender() == self.attach_button:
+            self._pending_manual_attach = True
+        # Restarting a pending timer collapses a burst of requests into one scan
+        self._refresh_timer.start()
+
+    def _refresh_tabs_now(self):
+        """Starts the window scan of the coalesced refresh requests"""
+        # Don't queue up scans behind a slow one, run a single follow-up instead
+        if self._scan_in_flight:
+            self._scan_requested_again = True
+            return
+        self._scan_in_flight = True
+        # Tabs are updated in apply_windows once the worker thread is done
+        self.scanRequested.emit()
+
+    def refresh_changed_windows(self):
+        """Checks only the windows reported by the hooks instead of enumerating all"""
+        # A burst of events emits many signals, the first call drains them all
+        hwnds = self.window_hook.take_dirty_windows()
+        if hwnds:
+            self.checkRequested.emit(list(hwnds))
+
+    def apply_changed_windows(self, windows):
+        """Updates tabs with the changed VirtualBox windows checked by the worker thread"""
+        self.apply_windows(windows, full_scan=False)
+
+    def apply_windows(self, windows, full_scan=True):
+        """Updates tabs with the VirtualBox windows found by the worker thread"""
+        current = {window.hwnd: window for window in windows}
+
+        # The manual attach flag belongs to the next full scan
+        is_manual_attach = full_scan and self._pending_manual_attach
+        if full_scan:
+            self._pending_manual_attach = False
+            self._scan_in_flight = False
+            if self._scan_requested_again:
+                self._scan_requested_again = False
+                self._refresh_tabs_now()
+
+        # Attached windows are child windows and not enumerated anymore,
+        # so only drop tabs whose window no longer exists
+        stale_tabs = [tab for hwnd, tab in self.tabs.items()
+                      if hwnd not in current and not _IsWindow(hwnd)]
+        # Removing from the end doesn't shift the indexes of the remaining tabs
+        stale_tabs.sort(key=self.tab_widget.indexOf, reverse=True)
+        with self._batch_tab_update(len(stale_tabs) > 1):
+            for tab in stale_tabs:
+                self._drop_tab(tab)
+
+        # The same windows as last time were already attached or skipped then
+        if full_scan:
+            scan_hwnds = frozenset(current)
+            unchanged = scan_hwnds == self._last_scan_hwnds
+            self._last_scan_hwnds = scan_hwnds
+            if unchanged and not is_manual_attach:
+                self._track_window_changes(current.keys() | self.tabs.keys())
+                return
+
+        # Loop invariants, bound once instead of looked up for every window
+        tabs = self.tabs
+        manually_detached_windows = self.manually_detached_windows
+        add_tab = self.tab_widget.addTab
+        auto_attach = self.settings.get("auto_attach", True)
+        use_window_container = self.settings.get("qt_window_container", False)
+
+        # Windows that already have a tab only matter for a manual attach
+        if is_manual_attach:
+            vbox_windows = list(current.values())
+        else:
+            vbox_windows = [window for hwnd, window in current.items() if hwnd not in tabs]
+
+        # Several new windows, e.g. after starting many VMs, are added with a single repaint
+        with self._batch_tab_update(len(vbox_windows) > 1):
+            for window in vbox_windows:
+                hwnd = window.hwnd
+
+                # Check if this window was manually detached previously
+                was_manually_detached = hwnd in manually_detached_windows
+
+                # If this is a manual attach action, remove from detached list
+                if is_manual_attach and was_manually_detached:
+                    manually_detached_windows.discard(hwnd)
+                    was_manually_detached = False
+
+                # Check if this window already exists and was manually detached
+                existing_tab = tabs.get(hwnd, None)
+                if existing_tab and existing_tab.detached_manually:
+                    was_manually_detached = True
+
+                # Determine if this window should be attached
+                # Only attach if: manual attach OR (auto-attach is enabled AND not manually detached before)
+                should_attach = is_manual_attach or (auto_attach and not was_manually_detached)
+
+                # Only add new tabs if auto-attach is enabled or if manually attaching
+                if existing_tab is None and (should_attach or is_manual_attach):
+                    tab = VBoxTab(window, use_window_container)
+                    tabs[hwnd] = tab
+                    add_tab(tab, tab.title)
+                    if should_attach:
+                        # Only the visible tab is attached right away, it also has a real size
+                        if self.tab_widget.currentWidget() is tab:
+                            tab.attach_window()
+                        else:
+                            tab.defer_attach()
+                # If tab exists but isn't attached and should be attached now
+                elif existing_tab is not None and is_manual_attach and not existing_tab.attached:
+                    # Reset the detached_manually flag when manually attaching
+                    existing_tab.detached_manually = False
+                    existing_tab.attach_window()
+
+        # Attached windows are no longer top-level, so count them via self.tabs
+        if full_scan:
+            self._track_window_changes(current.keys() | self.tabs.keys())
+
+    def attach_pending_tab(self, index):
+        """Attaches the window of a tab when it is shown for the first time"""
+        tab = self.tab_widget.widget(index)
+        if isinstance(tab, VBoxTab) and tab.attach_pending and _IsWindow(tab.hwnd):
+            tab.attach_window()
 
     def detach_tab(self, index):
         """Detaches tab and closes it"""
@@ -921,25 +1694,73 @@ class VirtualBoxTabs(QMainWindow):
         tab.detach_window()
 
         # Remove tab
-        self.tab_widget.removeTab(index)
-        del self.tabs[hwnd]
+        self._drop_tab(tab)
+
+    def changeEvent(self, event):
+        """Slows down automatic refresh while the window is inactive and stops it while minimized"""
+        super().changeEvent(event)
+        if event.type() not in (QEvent.ActivationChange, QEvent.WindowStateChange):
+            return
+        minimized = bool(self.windowState() & Qt.WindowMinimized)
+        active = self.isActiveWindow() and not minimized
+        changed = active != self._window_active
+        self._window_active = active
+        if minimized:
+            # Nothing of the tabs is visible, the hooks still track window changes
+            self.auto_refresh_timer.stop()
+            return
+        if not self.auto_refresh_timer.isActive():
+            self.auto_refresh_timer.start(self.refresh_interval_ms())
+            # Catch up on anything missed while minimized
+            self.refresh_signal.refreshRequested.emit()
+        elif changed:
+            self.auto_refresh_timer.setInterval(self.refresh_interval_ms())
+            if active:
+                # Catch up on anything missed while polling was slowed down
+                self.refresh_signal.refreshRequested.emit()
+
+    def nativeEvent(self, event_type, message):
+        """Pauses automatic refresh and VM window resizes while the main window is moved or resized"""
+        if event_type == b"windows_generic_MSG":
+            msg = wintypes.MSG.from_address(int(message))
+            if msg.message == win32con.WM_ENTERSIZEMOVE:
+                # Keep the GUI thread free while the window is dragged
+                self.auto_refresh_timer.stop()
+                VBoxTab.hold_resizes = True
+            elif msg.message == win32con.WM_EXITSIZEMOVE:
+                VBoxTab.hold_resizes = False
+                for tab in self.tabs.values():
+                    tab.flush_resize()
+                self.auto_refresh_timer.start(self.refresh_interval_ms())
+        return super().nativeEvent(event_type, message)
 
     def closeEvent(self, event):
         """Handles application window close event"""
+        self.window_hook.uninstall()
+        self.scan_thread.quit()
+        self.scan_thread.wait()
+        # Let a pending settings write finish
+        QThreadPool.globalInstance().waitForDone()
         # Always deattach all windows without a dialog box
-        for hwnd, tab in list(self.tabs.items()):
-            tab.detach_window()
+        self.detach_all_windows()
         event.accept()
 
-    # --- Drag & Drop to attach VirtualBox window ---
-    def dragEnterEvent(self, event):
-        # Allow Drag & Drop always
-        event.acceptProposedAction()
-
-    def dropEvent(self, event):
-        # Here you can implement attachment of a window by hwnd if you pass hwnd through mimeData
-        self.refresh_tabs()
-        event.acceptProposedAction()
+    def detach_all_windows(self):
+        """Detaches all attached windows in parallel, the Win32 calls release the GIL"""
+        tabs = [tab for tab in self.tabs.values() if tab.attached or tab.attach_pending]
+        # Qt window containers can only be touched from the GUI thread
+        for tab in tabs:
+            if tab.window_container is not None:
+                tab.detach_window()
+        tabs = [tab for tab in tabs if tab.attached or tab.attach_pending]
+        if not tabs:
+            return
+        with ThreadPoolExecutor(max_workers=min(32, len(tabs))) as executor:
+            pending = {executor.submit(tab.detach_window) for tab in tabs}
+            while pending:
+                _, pending = wait(pending, timeout=0.01)
+                # SetParent may send messages to our windows, deliver them so the workers don't block
+                win32gui.PeekMessage(0, win32con.WM_NULL, win32con.WM_NULL, win32con.PM_NOREMOVE)
 
     def close_current_window(self):
         """Forcefully closes the current VM window and removes its tab."""
@@ -960,63 +1781,22 @@ class VirtualBoxTabs(QMainWindow):
                 pass
             return
 
-        hwnd = tab.hwnd
-        process_id = None
-
-        # Get the process ID associated with the window.
-        try:
-            if win32gui.IsWindow(hwnd):
-                _, process_id = win32process.GetWindowThreadProcessId(hwnd)
-        except Exception:
-            # If getting PID fails, we can't terminate, but we'll still try to clean up the tab.
-            pass
-
-        # Terminate the process if we found a process ID.
-        if process_id:
-            try:
-                process_handle = win32api.OpenProcess(
-                    win32con.PROCESS_TERMINATE, False, process_id)
-                if process_handle:
-                    win32api.TerminateProcess(process_handle, 0)
-                    win32api.CloseHandle(process_handle)
-            except Exception as e:
-                if win32gui.IsWindow(hwnd):
-                    QMessageBox.warning(
-                        self, "Error", f"Failed to close VM window: {str(e)}")
-                    return
-
-        try:
-            if self.tab_widget and 0 <= index < self.tab_widget.count() and self.tab_widget.widget(index) == tab:
-                self.tab_widget.removeTab(index)
-                if hwnd in self.tabs:
-                    del self.tabs[hwnd]
-                tab.deleteLater()
-            else:
-                # If the tab at the index is no longer the one we started with,
-                # just clean up our internal dictionary.
-                if hwnd in self.tabs:
-                    del self.tabs[hwnd]
-
-            #QMessageBox.information(
-             #   self, "VM Closed", "The VM window has been forcefully closed.")
-
-        except Exception as e:
-            # If removing the tab from the UI fails, at least try to clean up the internal state.
-            if hwnd in self.tabs:
-                del self.tabs[hwnd]
-            QMessageBox.warning(
-                self, "Cleanup Error", f"An error occurred while removing the tab: {str(e)}")
+        self.close_tab_window(tab)
 
     def open_virtualbox_main(self):
         """Opens the main VirtualBox application"""
         vbox_path = self.settings["vbox_path"]
-        if os.path.exists(vbox_path):
-            try:
-                subprocess.Popen([vbox_path])
-                VB_MANAGER = True
-            except Exception as e:
-                QMessageBox.warning(
-                    self, "Error", f"Failed to open VirtualBox: {str(e)}")
+        # Only a found path is remembered, a missing one is checked again next time
+        if vbox_path in self._valid_vbox_paths or os.path.exists(vbox_path):
+            self._valid_vbox_paths.add(vbox_path)
+            # A plain GUI launch, no pipes or inherited handles needed
+            result = shell32.ShellExecuteW(
+                None, "open", vbox_path, None, None, win32con.SW_SHOWNORMAL)
+            if result <= 32:
+                self._valid_vbox_paths.discard(vbox_path)
+                # The remaining codes (file/path not found, access denied, ...) match Win32 errors
+                message = SHELL_EXECUTE_ERRORS.get(result) or ctypes.FormatError(result)
+                QMessageBox.warning(self, "Error", f"Failed to open VirtualBox: {message}")
         else:
             QMessageBox.warning(
                 self, "Error", f"VirtualBox executable not found at the specified path.\nPlease check the path in Settings:\n{vbox_path}")
@@ -1035,36 +1815,32 @@ class VirtualBoxTabs(QMainWindow):
         if not ctrl_pressed:
             self.tab_widget.setCurrentIndex(index)
 
-        style = QApplication.style()
-        rename_icon = style.standardIcon(QStyle.SP_FileDialogNewFolder)
-        detach_icon = style.standardIcon(QStyle.SP_DialogCancelButton)
-        close_icon = style.standardIcon(QStyle.SP_DialogResetButton)
-
-        menu = QMenu(self)
-        rename_action = QAction(rename_icon, "Rename", self)
-        detach_action = QAction(detach_icon, "Detach", self)
-        close_window_action = QAction(close_icon, "Close window", self)
-        menu.addAction(rename_action)
-        menu.addAction(detach_action)
-        menu.addAction(close_window_action)
-        action = menu.exec(tabBar.mapToGlobal(pos))
-        if action == rename_action:
-            # Rename the tab at 'index', not necessarily the current one
-            tab = self.tab_widget.widget(index)
-            current_name = tab.title
-            new_name, ok = QInputDialog.getText(
-                self, "Rename Tab", "Enter new name:", text=current_name
-            )
-            if ok and new_name:
-                tab.title = new_name
-                self.tab_widget.setTabText(index, new_name)
-        elif action == detach_action:
-            self.detach_tab(index)
-        elif action == close_window_action:
-            # Set the current index to the tab that was right-clicked
-            self.tab_widget.setCurrentIndex(index)
-            # Close the window
-            self.close_current_window()
+        # Icons come from the cache, which is refreshed on theme change
+        self.rename_tab_action.setIcon(self._icon(QStyle.SP_FileDialogNewFolder))
+        self.detach_tab_action.setIcon(self._icon(QStyle.SP_DialogCancelButton))
+        self.close_window_action.setIcon(self._icon(QStyle.SP_DialogResetButton))
+
+        self._context_menu_index = index
+        self.tab_menu.exec(tabBar.mapToGlobal(pos))
+
+    def rename_context_tab(self):
+        """Renames the right-clicked tab, not necessarily the current one"""
+        index = self._context_menu_index
+        tab = self.tab_widget.widget(index)
+        current_name = tab.title
+        new_name, ok = QInputDialog.getText(
+            self, "Rename Tab", "Enter new name:", text=current_name
+        )
+        if ok and new_name:
+            tab.title = new_name
+            self.tab_widget.setTabText(index, new_name)
+
+    def close_context_tab_window(self):
+        """Closes the VM window of the right-clicked tab"""
+        # Set the current index to the tab that was right-clicked
+        self.tab_widget.setCurrentIndex(self._context_menu_index)
+        # Close the window
+        self.close_current_window()
 
     # --- Detach when dragging a tab beyond --- Roadmap: Quickly deattach windows...
     # def mouseReleaseEvent(self, event):